@@ -24,7 +24,6 @@ from .mitm import *
 __all__ = [
     "Host",
     "Connection",
-    "Flow",
     "MITM",
     "Middleware",
     "Protocol",
@@ -5,7 +5,6 @@ Core components of the MITM framework.
 import asyncio
 import ssl
 from dataclasses import dataclass
-from enum import Enum
 from typing import Any, Optional
 
 
@@ -60,7 +59,7 @@ class Host:
 
         # At this point the self.writer is either None or a StreamWriter.
         if self.writer:
-            self.host, self.port = self.writer._transport.get_extra_info("peername")
+            self.host, self.port = self.writer.get_extra_info("peername")
 
     def __setattr__(self, name: str, value: Any) -> None:
         """
@@ -75,7 +74,7 @@ class Host:
             and not getattr(self, "host", None)
             and not getattr(self, "port", None)
         ):
-            self.host, self.port = value._transport.get_extra_info("peername")
+            self.host, self.port = value.get_extra_info("peername")
         return super().__setattr__(name, value)
 
     def __bool__(self):
@@ -124,19 +123,3 @@ class Connection:
 
     def __repr__(self):
         return f"<Connection client={self.client} server={self.server}>"
-
-
-class Flow(Enum):
-    """
-    Enum representing the flow of the connection.
-
-    Used within the :py:func:`mitm.MITM._relay` function to determine the flow of the
-    connection for middleware purposes.
-
-    Args:
-        CLIENT_TO_SERVER: The client is sending data to the server.
-        SERVER_TO_CLIENT: The server is sending data to the client.
-    """
-
-    CLIENT_TO_SERVER = 0
-    SERVER_TO_CLIENT = 1
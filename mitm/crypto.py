@@ -2,6 +2,7 @@
 Cryptography functionalities for mitm.
 """
 
+import functools
 import pathlib
 import random
 import socket
@@ -115,12 +116,31 @@ def new_pair(
     return key, crt
 
 
+@functools.lru_cache(maxsize=256)
+def ssl_context(cert_path: pathlib.Path, key_path: pathlib.Path) -> ssl.SSLContext:
+    """
+    Builds a server-side SSL context from a certificate and key pair.
+
+    Parsing PEM files costs X.509 decoding and key loading per call, so the
+    built contexts are cached per `(cert_path, key_path)` pair. This matters
+    most when intercepting with per-host certificates, where the same pair
+    would otherwise be reloaded from disk on every connection.
+
+    Args:
+        cert_path: Path of the certificate.
+        key_path: Path of the private key.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.options |= ssl.OP_NO_COMPRESSION
+    context.load_cert_chain(certfile=cert_path, keyfile=key_path)
+    return context
+
+
 def mitm_ssl_default_context() -> ssl.SSLContext:
     """
     Generates the default SSL context for `mitm`.
     """
     rsa_key, rsa_cert = __data__ / "mitm.key", __data__ / "mitm.crt"
-    new_pair(key_path=rsa_key, cert_path=rsa_cert)
-    context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
-    context.load_cert_chain(certfile=rsa_cert, keyfile=rsa_key)
-    return context
+    if not rsa_key.exists() or not rsa_cert.exists():
+        new_pair(key_path=rsa_key, cert_path=rsa_cert)
+    return ssl_context(rsa_cert, rsa_key)
@@ -95,39 +95,43 @@ class Log(Middleware):
         self.connection: Connection = None
 
     async def mitm_started(self, host: str, port: int):
-        logger.info("MITM server started on %s:%d." % (host, port))
+        logger.info("MITM server started on %s:%d.", host, port)
 
     async def client_connected(self, connection: Connection):
-        logger.info("Client %s has connected." % (connection.client))
+        logger.info("Client %s has connected.", connection.client)
 
     async def server_connected(self, connection: Connection):
-        logger.info("Connected to server %s." % (connection.server))
+        logger.info("Connected to server %s.", connection.server)
 
     async def client_data(self, connection: Connection, data: bytes) -> bytes:
 
         # The first request is intended for the 'mitm' server to discover the
         # destination server.
         if not connection.server:
-            logger.info("Client %s to mitm: \n\n\t%s\n" % (connection.client, data))
+            logger.info("Client %s to mitm: \n\n\t%s\n", connection.client, data)
 
         # All requests thereafter are intended for the destination server.
         else:
             logger.info(
-                "Client %s to server %s: \n\n\t%s\n"
-                % (connection.client, connection.server, data)
+                "Client %s to server %s: \n\n\t%s\n",
+                connection.client,
+                connection.server,
+                data,
             )
 
         return data
 
     async def server_data(self, connection: Connection, data: bytes) -> bytes:
         logger.info(
-            "Server %s to client %s: \n\n\t%s\n"
-            % (connection.server, connection.client, data)
+            "Server %s to client %s: \n\n\t%s\n",
+            connection.server,
+            connection.client,
+            data,
         )
         return data
 
     async def client_disconnected(self, connection: Connection):
-        logger.info("Client %s has disconnected." % (connection.client))
+        logger.info("Client %s has disconnected.", connection.client)
 
     async def server_disconnected(self, connection: Connection):
-        logger.info("Server %s has disconnected." % (connection.server))
+        logger.info("Server %s has disconnected.", connection.server)
@@ -4,17 +4,26 @@ Man-in-the-middle.
 
 import asyncio
 import logging
+import multiprocessing
+import os
+import socket
 import ssl
-from typing import List
+from typing import List, Optional
 
 from toolbox.asyncio.pattern import CoroutineClass
 
 from . import __data__, crypto, middleware, protocol
-from .core import Connection, Flow, Host
+from .core import Connection, Host
 
 logger = logging.getLogger(__package__)
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 
+# Write buffer high/low-water marks applied to both relay directions.
+# '_forward' also bounds its unflushed batch by the high-water mark, so
+# user-space buffering never exceeds what the transport itself may hold.
+_WRITE_HIGH = 1 << 20
+_WRITE_LOW = 1 << 18
+
 
 class MITM(CoroutineClass):
     """
@@ -27,10 +36,14 @@ class MITM(CoroutineClass):
         port: int = 8888,
         protocols: List[protocol.Protocol] = [protocol.HTTP],
         middlewares: List[middleware.Middleware] = [middleware.Log],
-        buffer_size: int = 8192,
+        buffer_size: int = 65536,
+        max_buffer_size: int = 262144,
+        tcp_buffer_size: int = 1 << 20,
         timeout: int = 5,
         keep_alive: bool = True,
-        ssl_context: ssl.SSLContext = crypto.mitm_ssl_default_context(),
+        workers: int = 1,
+        sock: Optional[socket.socket] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
         run: bool = False,
     ):
         """
@@ -41,10 +54,17 @@ class MITM(CoroutineClass):
             port: Port to listen on. Defaults to `8888`.
             protocols: List of protocols to use. Defaults to `[protocol.HTTP]`.
             middlewares: List of middlewares to use. Defaults to `[middleware.Log]`.
-            buffer_size: Buffer size to use. Defaults to `8192`.
+            buffer_size: Initial buffer size to use. Defaults to `65536`.
+            max_buffer_size: Largest size the buffer can grow to. Defaults to `262144`.
+            tcp_buffer_size: Kernel socket buffer size to use. Defaults to `1 << 20`.
             timeout: Timeout to use. Defaults to `5`.
             keep_alive: Whether to keep the connection alive. Defaults to `True`.
-            ssl_context: SSL context to use. Defaults to `crypto.mitm_ssl_default_context()`.
+            workers: Number of processes accepting connections. Defaults to `1`.
+            sock: Pre-bound listening socket to serve on instead of binding
+                `host`/`port` — lets an external process manager supply e.g. an
+                `SO_REUSEPORT` socket. Defaults to `None`.
+            ssl_context: SSL context to use. Defaults to `None`, which builds
+                `crypto.mitm_ssl_default_context()` once on initialization.
             run: Whether to start the server immediately. Defaults to `False`.
 
         Example:
@@ -60,36 +80,116 @@ class MITM(CoroutineClass):
         self.port = port
         self.protocols = protocols
         self.buffer_size = buffer_size
+        self.max_buffer_size = max_buffer_size
+        self.tcp_buffer_size = tcp_buffer_size
         self.timeout = timeout
         self.keep_alive = keep_alive
+
+        # Multiple workers rely on the kernel load-balancing accepts between
+        # per-process SO_REUSEPORT sockets, and on forking the configured MITM.
+        if workers > 1 and (
+            not hasattr(socket, "SO_REUSEPORT")
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            raise ValueError("workers > 1 requires SO_REUSEPORT and fork support.")
+        self.workers = workers
+        self.sock = sock
+        self._processes = []
+
+        # Certificate generation and parsing is expensive — build the default
+        # context once per MITM instead of once per connection (or at import).
+        if ssl_context is None:
+            ssl_context = crypto.mitm_ssl_default_context()
         self.ssl_context = ssl_context
 
         # Initialize any middleware that is not already initialized.
         new_middleware = []
-        for middleware in middlewares:
-            if isinstance(middleware, type):
-                middleware = middleware()
-            new_middleware.append(middleware)
+        for mw in middlewares:
+            if isinstance(mw, type):
+                mw = mw()
+            new_middleware.append(mw)
         self.middlewares = new_middleware
 
+        # Precomputed so the relay can skip middleware dispatch per-chunk when no
+        # middleware actually implements the data hooks.
+        self._has_client_data = any(
+            type(mw).client_data is not middleware.Middleware.client_data
+            for mw in self.middlewares
+        )
+        self._has_server_data = any(
+            type(mw).server_data is not middleware.Middleware.server_data
+            for mw in self.middlewares
+        )
+
+        # Swap in uvloop's libuv-based event loop when available — it cuts the
+        # per-read Python overhead substantially for relay workloads. Installed
+        # here, before the parent grabs its loop, rather than at import time,
+        # so merely importing the package never changes the host application's
+        # event-loop policy. Worker processes fork after this and inherit it.
+        try:
+            import uvloop
+
+            uvloop.install()
+        except ImportError:
+            pass
+
         super().__init__(run=run)
 
+    def _listen_socket(self) -> socket.socket:
+        """
+        Builds a listening socket for a worker process.
+
+        Every worker binds its own `SO_REUSEPORT` socket to the same address,
+        and the kernel load-balances incoming connections between them.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        return sock
+
+    async def _server(self) -> asyncio.AbstractServer:
+        """
+        Creates the asyncio server for the current process.
+        """
+
+        def handle(reader, writer):
+            return self.mitm(
+                Connection(
+                    client=Host(reader=reader, writer=writer),
+                    server=Host(),
+                    ssl_context=self.ssl_context,
+                )
+            )
+
+        if self.sock is not None:
+            return await asyncio.start_server(handle, sock=self.sock)
+        if self.workers > 1:
+            return await asyncio.start_server(handle, sock=self._listen_socket())
+        return await asyncio.start_server(handle, host=self.host, port=self.port)
+
+    def _worker(self):
+        """
+        Entry-point of an extra worker process.
+        """
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        """
+        Runs a worker's server on its own event loop.
+        """
+        server = await self._server()
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
     async def entry(self):
         """
         Runs the MITM server.
         """
         try:
-            server = await asyncio.start_server(
-                lambda reader, writer: self.mitm(
-                    Connection(
-                        client=Host(reader=reader, writer=writer),
-                        server=Host(),
-                        ssl_context=self.ssl_context,
-                    )
-                ),
-                host=self.host,
-                port=self.port,
-            )
+            server = await self._server()
         except OSError as e:
             self._loop.stop()
             raise e
@@ -97,61 +197,312 @@ class MITM(CoroutineClass):
         for mw in self.middlewares:
             await mw.mitm_started(host=self.host, port=self.port)
 
-        async with server:
-            await server.serve_forever()
+        # Forks the extra worker processes, each running its own event loop on
+        # a separate core. Connections are independent, so no state is shared.
+        for _ in range(self.workers - 1):
+            process = multiprocessing.get_context("fork").Process(
+                target=self._worker,
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
 
-    async def mitm(self, connection: Connection):
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for process in self._processes:
+                process.terminate()
+            self._processes.clear()
+
+    def _tune_socket(self, writer: asyncio.StreamWriter):
         """
-        Handles an incoming connection.
+        Applies the configured kernel options to a host's socket.
 
-        Warning:
-            This method is not intended to be called directly.
+        Larger kernel buffers remove bandwidth-delay-product bottlenecks when
+        relaying over higher latency links, and disabling Nagle's algorithm
+        (`TCP_NODELAY`) keeps small interactive writes from being held back up
+        to 40ms waiting to coalesce.
+        """
+        sock = writer.get_extra_info("socket")
+        if sock is None:
+            return
+        if self.tcp_buffer_size:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.tcp_buffer_size)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.tcp_buffer_size)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if hasattr(socket, "TCP_QUICKACK"):  # Linux-only.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+    def _can_pump(self, connection: Connection) -> bool:
+        """
+        Whether the connection can relay through the raw socket fast path.
+
+        The fast path bypasses the stream layer, so it is only safe when no
+        middleware inspects the relayed data, neither leg is TLS (TLS runs
+        above the raw socket), nothing is left sitting in the write buffers,
+        and the loop supports the low-level socket methods (the Windows
+        proactor loop does not mix them with transports).
         """
+        if self._has_client_data or self._has_server_data:
+            return False
+        loop = asyncio.get_event_loop()
+        if isinstance(loop, getattr(asyncio, "ProactorEventLoop", ())):
+            return False
+        for host in (connection.client, connection.server):
+            if host.writer.get_extra_info("ssl_object") is not None:
+                return False
+            if host.writer.get_extra_info("socket") is None:
+                return False
+            if host.writer.transport.get_write_buffer_size() > 0:
+                return False
+        return True
+
+    async def _pump(self, src: socket.socket, dst: socket.socket, leftover: bytes):
+        """
+        Pumps one direction of a connection between two raw sockets.
+
+        One `recv_into` and one `sendall` per chunk, reusing a single
+        preallocated buffer, with no Transport/Protocol dispatch in between.
+        """
+        loop = asyncio.get_event_loop()
 
-        async def _relay(connection: Connection, event: asyncio.Event, flow: Flow):
-            """
-            Forwards data between two hosts in a Connection.
-            """
+        buffer = bytearray(self.max_buffer_size)
+        view = memoryview(buffer)
 
-            if flow == Flow.CLIENT_TO_SERVER:
-                reader = connection.client.reader
-                writer = connection.server.writer
-            elif flow == Flow.SERVER_TO_CLIENT:
-                reader = connection.server.reader
-                writer = connection.client.writer
+        try:
+            if leftover:
+                await loop.sock_sendall(dst, leftover)
+
+            while True:
+                try:
+                    read = await asyncio.wait_for(
+                        loop.sock_recv_into(src, view),
+                        self.timeout,
+                    )
+                except asyncio.exceptions.TimeoutError:
+                    # Matches the stream path: with 'keep_alive' an idle
+                    # connection stays open and only EOF or an error ends it.
+                    if self.keep_alive:
+                        continue
+                    break
+                if not read:
+                    break
+                await loop.sock_sendall(dst, view[:read])
+        except OSError:
+            pass
 
-            while not event.is_set() and not reader.at_eof():
+        # Propagates the half-close so the peer direction ends promptly.
+        try:
+            dst.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    async def _pump_relay(self, connection: Connection):
+        """
+        Relays between the raw sockets of the two hosts, in both directions.
+
+        The stream transports are paused so they stop consuming the sockets,
+        and whatever their readers already buffered is handed to the peer
+        before the pumps take over.
+        """
+        client, server = connection.client, connection.server
+        client.writer.transport.pause_reading()
+        server.writer.transport.pause_reading()
+
+        # The event loop refuses its 'sock_*' methods on descriptors that are
+        # owned by a transport, so the pumps run on duplicates of the sockets
+        # while the (paused) transports keep ownership of the originals.
+        c_sock = socket.socket(
+            fileno=os.dup(client.writer.get_extra_info("socket").fileno())
+        )
+        s_sock = socket.socket(
+            fileno=os.dup(server.writer.get_extra_info("socket").fileno())
+        )
+        c_sock.setblocking(False)
+        s_sock.setblocking(False)
+
+        try:
+            await asyncio.gather(
+                self._pump(c_sock, s_sock, bytes(client.reader._buffer)),
+                self._pump(s_sock, c_sock, bytes(server.reader._buffer)),
+            )
+        finally:
+            c_sock.close()
+            s_sock.close()
+
+    async def _forward(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        connection: Connection,
+        data_hooks: Optional[list],
+    ):
+        """
+        Forwards data from a reader to a writer until either side closes.
+
+        The direction-specific pieces — the endpoints and the middleware data
+        hooks — are resolved once by the `_relay_*` wrappers, so the loop
+        carries no per-chunk direction dispatch.
+        """
+
+        # Chunks awaiting a flush, and the drain of the previous flush. While a
+        # drain is in-flight we keep reading so that multiple chunks are written
+        # with a single 'writelines' call (one syscall per batch) instead of one
+        # 'write' + 'drain' round-trip per chunk.
+        pending, pending_size, drain = [], 0, None
+
+        # Read size adapts to the flow: full reads double it (up to
+        # 'max_buffer_size') while mostly-empty reads shrink it back down, so
+        # idle connections do not hold onto large buffers and bulk transfers
+        # are not capped by small ones.
+        size = min(self.buffer_size, self.max_buffer_size)
+
+        try:
+            while not reader.at_eof():
                 data = None
                 try:
                     data = await asyncio.wait_for(
-                        reader.read(self.buffer_size),
+                        reader.read(size),
                         self.timeout,
                     )
                 except asyncio.exceptions.TimeoutError:
                     pass
 
                 if not data:
-                    event.set()
                     break
                 else:
+                    if len(data) == size and size < self.max_buffer_size:
+                        size = min(size * 2, self.max_buffer_size)
+                    elif len(data) < size // 4 and size > 4096:
+                        size = max(size // 2, 4096)
+
+                    # Pass data through the middleware data hooks.
+                    if data_hooks:
+                        for hook in data_hooks:
+                            data = await hook(connection, data)
+
+                    pending.append(data)
+                    pending_size += len(data)
+
+                    # Waits for the previous drain once the batch holds more
+                    # bytes than the transport's high-water mark.
+                    if drain and not drain.done() and pending_size >= _WRITE_HIGH:
+                        await drain
+
+                    # Flushes the batch unless a drain is still in-flight. The
+                    # transport copies the chunks out synchronously, so the same
+                    # list can be reused across batches instead of reallocated.
+                    if not drain or drain.done():
+                        if drain:
+                            drain.result()
+                        writer.writelines(pending)
+                        pending.clear()
+                        pending_size = 0
+                        drain = asyncio.ensure_future(writer.drain())
+        finally:
+            # Runs on cancellation too — when the sibling direction finishes
+            # this one is cancelled mid-batch, and anything still in 'pending'
+            # would be silently dropped. Handing it to the transport here needs
+            # no await; the event loop keeps flushing it while the connection
+            # winds down.
+            if pending and not writer.transport.is_closing():
+                writer.writelines(pending)
+                pending.clear()
+            # Settles the in-flight drain so a connection error it hits later
+            # is not reported as a never-retrieved task exception.
+            if drain:
+                if drain.done():
+                    if not drain.cancelled():
+                        drain.exception()
+                else:
+                    drain.cancel()
+
+        # On a normal exit, waits for everything handed to the transport.
+        await writer.drain()
+
+    def _relay_client_to_server(self, connection: Connection):
+        """
+        Forwards data flowing from the client to the server.
+        """
+        return self._forward(
+            connection.client.reader,
+            connection.server.writer,
+            connection,
+            [mw.client_data for mw in self.middlewares]
+            if self._has_client_data
+            else None,
+        )
+
+    def _relay_server_to_client(self, connection: Connection):
+        """
+        Forwards data flowing from the server to the client.
+        """
+        return self._forward(
+            connection.server.reader,
+            connection.client.writer,
+            connection,
+            [mw.server_data for mw in self.middlewares]
+            if self._has_server_data
+            else None,
+        )
 
-                    # Pass data through middlewares.
-                    for mw in self.middlewares:
-                        if flow == Flow.SERVER_TO_CLIENT:
-                            data = await mw.server_data(connection, data)
-                        elif flow == Flow.CLIENT_TO_SERVER:
-                            data = await mw.client_data(connection, data)
+    async def mitm(self, connection: Connection):
+        """
+        Handles an incoming connection.
 
-                    writer.write(data)
-                    await writer.drain()
+        Warning:
+            This method is not intended to be called directly.
+        """
+
+        self._tune_socket(connection.client.writer)
 
         #  Calls middlewares for client initial connect.
         for mw in self.middlewares:
             await mw.client_connected(connection=connection)
 
-        # Gets the bytes needed to identify the protocol.
+        # Gets the bytes needed to identify the protocol. The head may arrive
+        # across several reads, so the chunks are collected as-is and joined
+        # once at the end — no intermediate buffer growth — bounded by the
+        # timeout for clients that never finish sending a head.
         min_bytes_needed = max(proto.bytes_needed for proto in self.protocols)
-        data = await connection.client.reader.read(n=min_bytes_needed)
+
+        # Reading stops early once any protocol's head terminator shows up. A
+        # protocol that declares none resolves on whatever the first read
+        # returns — it may owe its client a reply before more data comes.
+        terminators = [proto.head_terminator for proto in self.protocols]
+        single_read = any(term is None for term in terminators)
+        keep = 0 if single_read else max(len(term) for term in terminators) - 1
+        chunks, length, tail = [], 0, b""
+
+        async def read_head():
+            nonlocal length, tail
+            while length < min_bytes_needed:
+                chunk = await connection.client.reader.read(min_bytes_needed - length)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                length += len(chunk)
+                if single_read:
+                    break
+
+                # Only the new chunk (and its boundary with the previous one)
+                # needs scanning for a terminator.
+                window = tail + chunk
+                if any(term in window for term in terminators):
+                    break
+                tail = window[-keep:] if keep else b""
+
+        try:
+            await asyncio.wait_for(read_head(), self.timeout)
+        except asyncio.exceptions.TimeoutError:
+            pass
+
+        # Heads nearly always arrive in a single read — pass that chunk through
+        # as-is instead of paying a join copy for it.
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
 
         # Calls middleware on client's data.
         for mw in self.middlewares:
@@ -159,43 +510,69 @@ class MITM(CoroutineClass):
 
         # Finds the protocol that matches the data, and connects to the server.
         found, proto = False, None
-        for protocol in self.protocols:
+        for proto in self.protocols:
             try:
-                found = await protocol.connect(connection=connection, data=data)
+                found = await proto.connect(connection=connection, data=data)
                 if found:
-                    proto = protocol
                     break
             except protocol.InvalidProtocol:
                 pass
 
         # Protocol was found, and we connected to a server.
         if found and connection.server:
+            self._tune_socket(connection.server.writer)
 
             # Calls middleware for server initial connect.
             for mw in self.middlewares:
                 await mw.server_connected(connection=connection)
 
-            # Keeps the connection alive until the client or server closes it.
-            run_once = True
-            while (
-                not connection.client.reader.at_eof()
-                and not connection.server.reader.at_eof()
-                and (self.keep_alive or run_once)
-            ):
-
-                # Keeps trying to relay data until the connection closes.
-                event = asyncio.Event()
-                await asyncio.gather(
-                    _relay(connection, event, Flow.SERVER_TO_CLIENT),
-                    _relay(connection, event, Flow.CLIENT_TO_SERVER),
+            # Raises the write buffer high-water mark on both directions so that
+            # 'drain' does not return after every chunk, letting '_forward' batch.
+            for host in (connection.client, connection.server):
+                host.writer.transport.set_write_buffer_limits(
+                    high=_WRITE_HIGH,
+                    low=_WRITE_LOW,
                 )
 
-                # Run the while loop only one iteration if keep_alive is False.
-                run_once = False
+            # Plain relays with no data middleware skip the stream layer.
+            if self._can_pump(connection):
+                await self._pump_relay(connection)
+
+            # Keeps the connection alive until the client or server closes it.
+            else:
+                run_once = True
+                while (
+                    not connection.client.reader.at_eof()
+                    and not connection.server.reader.at_eof()
+                    and (self.keep_alive or run_once)
+                ):
+
+                    # Relays until one direction closes or idles out, then
+                    # cancels the other, so a half-closed connection is torn
+                    # down immediately instead of idling out on its own.
+                    done, pending = await asyncio.wait(
+                        {
+                            asyncio.ensure_future(
+                                self._relay_server_to_client(connection)
+                            ),
+                            asyncio.ensure_future(
+                                self._relay_client_to_server(connection)
+                            ),
+                        },
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    for task in done:
+                        task.result()
+
+                    # Run the while loop only one iteration if keep_alive is False.
+                    run_once = False
         elif found and not connection.server:
             raise ValueError(
                 "The protocol was found, but the server was not connected. "
-                f"Check the {proto.__class__.__name__} implementation."
+                f"Check the {proto.__name__} implementation."
             )
 
         # If a server connection exists, we close it.
@@ -3,14 +3,21 @@ Custom protocol implementations for the MITM proxy.
 """
 
 import asyncio
+import re
 import ssl
 from abc import ABC, abstractclassmethod
 
-from httpq import Request
 from toolbox.asyncio.streams import tls_handshake
 
 from .core import Connection, Host
-from typing import Tuple
+from typing import Optional, Tuple
+
+
+# Matches the value of the 'Host' header, compiled once for all connections.
+_HOST_RE = re.compile(rb"(?im)^host:[ \t]*([^\r\n]+)")
+
+# Response accepting a 'CONNECT' request.
+_CONNECT_OK = b"HTTP/1.1 200 OK\r\n\r\n"
 
 
 class InvalidProtocol(Exception):
@@ -31,8 +38,15 @@ class Protocol(ABC):
     the `max()` of the `bytes_needed` of all the protocols, and reading that many
     bytes from the connection.
 
+    The `head_terminator` is a byte sequence that marks the end of the data the
+    protocol needs — once it is seen, `mitm` stops reading early instead of waiting
+    for `bytes_needed` bytes or a timeout. When any registered protocol leaves it as
+    `None`, a single read resolves the head, since the protocol may expect a reply
+    before its client sends anything more.
+
     Args:
         bytes_needed: The minimum number of bytes needed to identify the protocol.
+        head_terminator: Byte sequence ending the protocol's head, or `None`.
 
     Example:
 
@@ -51,6 +65,7 @@ class Protocol(ABC):
     """
 
     bytes_needed: int
+    head_terminator: Optional[bytes] = None
 
     @abstractclassmethod
     async def resolve_destination(
@@ -111,9 +126,18 @@ class HTTP(Protocol):
     `bytes_needed` is set to 8192 to ensure we can read the first line of the request.
     The HTTP/1.1 protocol does not define a minimum length for the first line, so we
     use the largest number found in other projects.
+
+    `head_terminator` is the blank line ending the request head — requests shorter
+    than `bytes_needed` resolve as soon as it arrives.
+
+    `tls_handshake_timeout` bounds the TLS handshakes with the client and the
+    destination server so that a stalled peer cannot hold the connection open
+    indefinitely.
     """
 
     bytes_needed = 8192
+    head_terminator = b"\r\n\r\n"
+    tls_handshake_timeout = 5
 
     @classmethod
     async def resolve_destination(
@@ -123,47 +147,66 @@ class HTTP(Protocol):
     ) -> Tuple[str, int, bool]:
         """
         Resolves the destination server for the protocol.
+
+        The request head is parsed with a single pass over the raw bytes — the
+        only pieces `mitm` needs are the method, and either the `CONNECT` target
+        or the `Host` header.
         """
+
+        # Parse the request line.
         try:
-            request = Request.parse(data)
-        except:
+            line = data.split(b"\r\n", 1)[0]
+            method, target, version = line.split(b" ", 2)
+        except ValueError:
+            raise InvalidProtocol
+        if not version.startswith(b"HTTP/"):
             raise InvalidProtocol
 
         # Deal with 'CONNECT'.
-        using_ssl = None
-        if request.method == "CONNECT":
+        if method == b"CONNECT":
             using_ssl = True
 
             # Get the hostname and port.
-            if not request.target:
+            host, _, port = target.partition(b":")
+            if not host or not port:
                 raise InvalidProtocol
-            host, port = request.target.string.split(":")
 
-            # Accept client connection.
-            connection.client.writer.write(b"HTTP/1.1 200 OK\r\n\r\n")
-            await connection.client.writer.drain()
+            # Accept client connection. No drain — the transport keeps flushing
+            # its buffer (in plaintext) underneath the TLS handshake below, so
+            # awaiting here only adds an event-loop round-trip.
+            connection.client.writer.write(_CONNECT_OK)
 
             # Perform handshake.
             try:
-                await tls_handshake(
-                    reader=connection.client.reader,
-                    writer=connection.client.writer,
-                    ssl_context=connection.ssl_context,
-                    server_side=True,
+                await asyncio.wait_for(
+                    tls_handshake(
+                        reader=connection.client.reader,
+                        writer=connection.client.writer,
+                        ssl_context=connection.ssl_context,
+                        server_side=True,
+                    ),
+                    cls.tls_handshake_timeout,
                 )
-            except ssl.SSLError:
+            except (ssl.SSLError, asyncio.TimeoutError):
                 raise InvalidProtocol
 
         # Deal with any other HTTP method.
-        elif request.method:
+        else:
             using_ssl = False
 
-            # Get the hostname and port.
-            if not "Host" in request.headers:
+            # Get the hostname and port. The search is bounded to the head so a
+            # 'Host:' line inside the body can never match, without copying the
+            # head out of the data first.
+            end = data.find(b"\r\n\r\n")
+            match = _HOST_RE.search(data, 0, end if end != -1 else len(data))
+            if not match:
                 raise InvalidProtocol
-            host, port = request.headers.get("Host").string, 80
+            host, port = match.group(1).strip(), 80
 
-        return host, int(port), using_ssl
+        try:
+            return host.decode("ascii"), int(port), using_ssl
+        except (UnicodeDecodeError, ValueError):
+            raise InvalidProtocol
 
     @classmethod
     async def connect(cls: Protocol, connection: Connection, data: bytes) -> bool:
@@ -189,6 +232,7 @@ class HTTP(Protocol):
             host=host,
             port=port,
             ssl=tls,
+            ssl_handshake_timeout=cls.tls_handshake_timeout if tls else None,
         )
         connection.server = Host(reader, writer)
 